@@ -1,15 +1,133 @@
+import hashlib
+import json
+import os
+import tempfile
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import yaml
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 from avidtools.datamodels.report import Report
-from avidtools.datamodels.components import *
+from avidtools.datamodels.components import Affects, Artifact, Problemtype, Reference, LangValue
+from avidtools.datamodels.enums import ArtifactTypeEnum, ClassEnum, TypeEnum
 
 ATLAS_HOME = 'https://raw.githubusercontent.com/mitre-atlas/atlas-data/main/data/case-studies/'
+TIMEOUT = 30
+MAX_WORKERS = 16
+# set CACHE_DIR to a path to relocate the on-disk cache, or to None to disable
+# it; by default it is resolved on first use under $XDG_CACHE_HOME or ~/.cache
+DEFAULT_CACHE_DIR = object()
+CACHE_DIR = DEFAULT_CACHE_DIR
+CACHE_VERSION = 1
+
+# all case studies live on the same host, so keep one pooled session around
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_maxsize = 32,
+    max_retries = Retry(
+        total = 3,
+        backoff_factor = 0.3,
+        status_forcelist = (429, 500, 502, 503, 504)
+    )
+))
+
+def close_session():
+    SESSION.close()
+
+def _cache_dir():
+    if CACHE_DIR is None:
+        return None
+    if CACHE_DIR is not DEFAULT_CACHE_DIR:
+        return Path(CACHE_DIR)
+    try:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    except (RuntimeError, KeyError):
+        # no home directory to put the cache in, so run without it
+        return None
+    return Path(base) / 'avidtools' / 'atlas'
+
+def _cache_file(url):
+    # key on the full URL so ids can't escape the cache directory and a
+    # different ATLAS_HOME doesn't reuse stale entries
+    cache_dir = _cache_dir()
+    if cache_dir is None:
+        return None
+    return cache_dir / (hashlib.sha256(url.encode()).hexdigest() + '.json')
+
+def _load_cached(url):
+    cache_file = _cache_file(url)
+    if cache_file is None:
+        return None
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as infile:
+            cached = json.load(infile)
+    except (OSError, ValueError):
+        return None
+    if (not isinstance(cached, dict)
+            or cached.get('version') != CACHE_VERSION
+            or cached.get('url') != url
+            or not isinstance(cached.get('etag'), str)
+            or not isinstance(cached.get('content'), str)):
+        return None
+    return cached
 
+def _save_cached(url, etag, content):
+    cache_file = _cache_file(url) if etag else None
+    if cache_file is None:
+        return
+    tmp_name = None
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=cache_file.parent,
+                                         suffix='.tmp', delete=False) as outfile:
+            tmp_name = outfile.name
+            json.dump({'version': CACHE_VERSION, 'url': url, 'etag': etag, 'content': content}, outfile)
+        os.replace(tmp_name, cache_file)
+    except OSError:
+        if tmp_name is not None:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+@lru_cache(maxsize=512)
 def import_case_study(case_study_id):
-    req = requests.get(ATLAS_HOME+case_study_id+'.yaml')
-    case_study = yaml.safe_load(req.content)
+    # results are memoized per process (import_case_study.cache_clear() forces
+    # a refetch); the returned dict is shared between callers, so treat it as
+    # read-only. Across processes, the raw YAML is kept on disk and
+    # revalidated with the ETag, so unchanged files are not downloaded again
+    url = ATLAS_HOME+case_study_id+'.yaml'
+    cached = _load_cached(url)
+    headers = {}
+    if cached is not None:
+        headers['If-None-Match'] = cached['etag']
+    
+    req = SESSION.get(url, headers=headers, timeout=TIMEOUT)
+    if req.status_code == 304 and cached is not None:
+        return yaml.load(cached['content'], Loader=SafeLoader)
+    # raise rather than return error pages; lru_cache doesn't keep exceptions
+    req.raise_for_status()
+    
+    case_study = yaml.load(req.content, Loader=SafeLoader)
+    _save_cached(url, req.headers.get('ETag'), req.text)
     return case_study
+
+def import_case_studies(case_study_ids, max_workers=MAX_WORKERS):
+    # fetches overlap on the shared session; keep max_workers at or below the
+    # adapter's pool size, and lower it if requests start failing with 429s
+    case_study_ids = list(case_study_ids)
+    unique_ids = list(dict.fromkeys(case_study_ids))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        case_studies = dict(zip(unique_ids, executor.map(import_case_study, unique_ids)))
+    return [case_studies[case_study_id] for case_study_id in case_study_ids]
     
 def convert_case_study(case_study):
     report = Report()
@@ -32,27 +150,29 @@ def convert_case_study(case_study):
         )
     )
     
-    report.references = [
+    references = [
         Reference(
             type = 'source',
             label = case_study['name'],
             url = 'https://atlas.mitre.org/studies/'+case_study['id']
         )
-    ] + [
+    ]
+    references.extend(
         Reference(
             type = 'source',
             label = ref['title'],
             url = ref['url']
         )
         for ref in case_study['references']
-    ]
+    )
+    report.references = references
     
     report.description = LangValue(
         lang = 'eng',
         value = case_study['summary']
     )
     
-    if 'reporter' in list(case_study.keys()):
+    if 'reporter' in case_study:
         report.credit = [
             LangValue(
                 lang = 'eng',